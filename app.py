@@ -1,22 +1,48 @@
+import time
+_t_start = time.perf_counter()
+
+import sqlite3
 import streamlit as st
 from pathlib import Path
 import pandas as pd
-import io
 
-from utils.db import read_table
+from utils.db import init_db, list_years, month_range
+from utils.db import archive_year, unarchive_year, is_archived
 from utils.auth import authenticate, register_user
-from utils.ingest_excel import ingest_hotel_kinerja, ingest_absensi
-from utils.ingest_excel import normalize_columns
+from utils.analytics import hotel_yoy, hotel_ranking, absensi_percentile_bands
+from utils.helpers import record_startup, STARTUP_METRICS
+from utils.helpers import BULAN_MAP, BULAN_REVERSE
+from utils.shared import get_dataset, select_rows, take_rows, memory_report
+
+# ingest (openpyxl) & export Excel sengaja di-import belakangan,
+# hanya di jalur admin / download
+if "import" not in STARTUP_METRICS:
+    # reruns memakai modul yang sudah ter-import, cukup dicatat saat cold start
+    record_startup("import", _t_start)
 
 # ======================
 # HELPER (ANTI 2,025)
 # ======================
 def show_df(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # assign (copy-on-write) hanya mengganti kolom tahun, kolom lain tidak disalin
     if "tahun" in df.columns:
-        df["tahun"] = df["tahun"].astype(str)
+        df = df.assign(tahun=df["tahun"].astype(str))
     return df
 
+
+def load_table(table_name: str, tahun: int) -> pd.DataFrame:
+    # frame bersama antar-sesi, hanya partisi tahun yang dipilih; jangan diubah
+    return get_dataset(table_name, tahun)
+
+
+def excel_bytes(sheets: dict) -> bytes:
+    import io
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return output.getvalue()
+
 # ======================
 # KONFIGURASI HALAMAN
 # ======================
@@ -94,39 +120,28 @@ if st.sidebar.button("Logout"):
     st.session_state.role = None
     st.rerun()
 
-# ======================
-# BULAN
-# ======================
-BULAN_MAP = {
-    "Januari": 1, "Februari": 2, "Maret": 3, "April": 4,
-    "Mei": 5, "Juni": 6, "Juli": 7, "Agustus": 8,
-    "September": 9, "Oktober": 10, "November": 11, "Desember": 12
-}
-BULAN_REVERSE = {v: k for k, v in BULAN_MAP.items()}
-
 # ======================
 # LOAD DATA
 # ======================
-df_hotel = read_table("hotel_kinerja")
-df_absen = read_table("absensi")
+@st.cache_resource
+def init_db_once():
+    # migrasi data lama cukup sekali per proses, bukan setiap rerun/sesi
+    init_db()
+
 
-df_hotel["tahun"] = pd.to_numeric(df_hotel["tahun"], errors="coerce")
-df_hotel["bulan"] = pd.to_numeric(df_hotel["bulan"], errors="coerce")
+init_db_once()
 
-if not df_absen.empty:
-    df_absen["tahun"] = pd.to_numeric(df_absen["tahun"], errors="coerce")
+hotel_tahun_list = list_years("hotel_kinerja")
 
 # ======================
 # FILTER GLOBAL
 # ======================
 st.sidebar.header("🎛 Filter Data")
 
-tahun_list = sorted(df_absen["tahun"].dropna().astype(int).unique())
+tahun_list = list_years("absensi")
 tahun_pilih = st.sidebar.selectbox("Tahun", tahun_list)
 
-df_tahun = df_absen[df_absen["tahun"] == tahun_pilih]
-bulan_min = int(df_tahun["bulan"].min())
-bulan_max = int(df_tahun["bulan"].max())
+bulan_min, bulan_max = month_range("absensi", tahun_pilih)
 
 bulan_awal = BULAN_MAP[
     st.sidebar.selectbox(
@@ -143,29 +158,33 @@ bulan_akhir = BULAN_MAP[
     )
 ]
 
-df_absen_f = df_absen[
-    (df_absen["tahun"] == tahun_pilih) &
-    (df_absen["bulan"].between(bulan_awal, bulan_akhir))
-]
+# ======================
+# HALAMAN
+# ======================
+# hanya halaman yang dipilih yang dijalankan (st.tabs menjalankan semuanya)
+halaman = st.radio(
+    "Halaman",
+    ["🏨 Kinerja Hotel", "👥 Absensi"],
+    horizontal=True,
+    label_visibility="collapsed",
+    key="halaman"
+)
 
 # ======================
-# TABS
+# WAKTU STARTUP
 # ======================
-tab1, tab2 = st.tabs(["🏨 Kinerja Hotel", "👥 Absensi"])
+# first paint = header, filter & navigasi sudah tampil (sebelum isi halaman,
+# yang bisa berhenti lebih awal lewat st.stop)
+if "first_paint_ms" not in st.session_state:
+    st.session_state.first_paint_ms = record_startup("first_paint", _t_start)
 
-with tab1:
+if halaman == "🏨 Kinerja Hotel":
     st.subheader("🏨 Monitoring Kinerja Hotel")
 
-    if df_hotel.empty:
+    if not hotel_tahun_list:
         st.info("Data kinerja hotel belum tersedia.")
         st.stop()
 
-    # ======================
-    # PASTIKAN TIPE DATA BENAR
-    # ======================
-    df_hotel["tahun"] = pd.to_numeric(df_hotel["tahun"], errors="coerce")
-    df_hotel["bulan"] = pd.to_numeric(df_hotel["bulan"], errors="coerce")
-
     # ======================
     # TEMPLATE BLOK INDIKATOR
     # ======================
@@ -176,14 +195,13 @@ with tab1:
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            tahun_list = sorted(df_hotel["tahun"].dropna().astype(int).unique())
             tahun_pilih = st.selectbox(
                 "Tahun",
-                tahun_list,
+                hotel_tahun_list,
                 key=f"{kolom}_tahun"
             )
 
-        df_tahun = df_hotel[df_hotel["tahun"] == tahun_pilih]
+        df_tahun = load_table("hotel_kinerja", tahun_pilih)
 
         with col2:
             bulan_awal = st.selectbox(
@@ -201,15 +219,13 @@ with tab1:
                 key=f"{kolom}_bulan_akhir"
             )
 
-        df_f = df_hotel[
-            (df_hotel["tahun"] == tahun_pilih) &
-            (df_hotel["bulan"].between(
-                BULAN_MAP[bulan_awal],
-                BULAN_MAP[bulan_akhir]
-            ))
-        ]
+        idx = select_rows(
+            df_tahun,
+            BULAN_MAP[bulan_awal],
+            BULAN_MAP[bulan_akhir]
+        )
 
-        hotel_list = sorted(df_f["hotel"].dropna().unique())
+        hotel_list = sorted(df_tahun["hotel"].take(idx).dropna().unique())
         hotel_pilih = st.multiselect(
             "Pilih Hotel (kosongkan = semua)",
             hotel_list,
@@ -217,14 +233,22 @@ with tab1:
         )
 
         if hotel_pilih:
-            df_f = df_f[df_f["hotel"].isin(hotel_pilih)]
+            idx = select_rows(
+                df_tahun,
+                BULAN_MAP[bulan_awal],
+                BULAN_MAP[bulan_akhir],
+                hotel=hotel_pilih
+            )
+
+        # hanya kolom yang ditampilkan yang diambil dari frame bersama
+        df_f = take_rows(df_tahun, idx, ["hotel", "bulan", kolom])
 
         # ======================
         # GRAFIK
         # ======================
         if df_f.empty:
             st.info("Tidak ada data sesuai filter.")
-            return pd.DataFrame()
+            return None
 
         chart_df = (
             df_f.groupby("bulan")[kolom]
@@ -242,52 +266,119 @@ with tab1:
         # ======================
         # TABEL
         # ======================
-        tabel = (
-            df_f[["hotel", "bulan", kolom]]
-            .sort_values(["hotel", "bulan"])
-        )
+        tabel = df_f.sort_values(["hotel", "bulan"])
         tabel["bulan"] = tabel["bulan"].map(BULAN_REVERSE)
 
         st.dataframe(tabel, use_container_width=True)
 
-        return tabel
+        # filter dikembalikan untuk job export Excel
+        return (
+            tahun_pilih,
+            BULAN_MAP[bulan_awal],
+            BULAN_MAP[bulan_akhir],
+            tuple(hotel_pilih)
+        )
 
     # ======================
     # PANGGIL SEMUA INDIKATOR
     # ======================
-    tpk_tbl   = indikator_section("TPK", "tpk")
-    gpr_tbl   = indikator_section("GPR", "gpr")
-    tptt_tbl  = indikator_section("TPTT", "tptt")
-    rlmta_tbl = indikator_section("RLMTA", "rlmta")
-    rlmtn_tbl = indikator_section("RLMTN", "rlmtn")
+    export_filters = {
+        "tpk":   indikator_section("TPK", "tpk"),
+        "gpr":   indikator_section("GPR", "gpr"),
+        "tptt":  indikator_section("TPTT", "tptt"),
+        "rlmta": indikator_section("RLMTA", "rlmta"),
+        "rlmtn": indikator_section("RLMTN", "rlmtn"),
+    }
+
+    # ======================
+    # ANALITIK (SQL)
+    # ======================
+    st.markdown("## 🏆 Analitik Kinerja Hotel")
+    st.caption(
+        f"Periode filter global: {BULAN_REVERSE[bulan_awal]} – "
+        f"{BULAN_REVERSE[bulan_akhir]} {tahun_pilih}"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        analitik_kolom = st.selectbox(
+            "Indikator",
+            ["tpk", "gpr", "tptt", "rlmta", "rlmtn"],
+            format_func=str.upper,
+            key="analitik_kolom"
+        )
+    with col2:
+        analitik_n = st.number_input(
+            "Jumlah Hotel (N)", min_value=1, max_value=50, value=5,
+            key="analitik_n"
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**🔝 Top {analitik_n}**")
+        st.dataframe(
+            hotel_ranking(analitik_kolom, tahun_pilih, bulan_awal, bulan_akhir, analitik_n),
+            use_container_width=True, hide_index=True
+        )
+    with col2:
+        st.markdown(f"**🔻 Bottom {analitik_n}**")
+        st.dataframe(
+            hotel_ranking(
+                analitik_kolom, tahun_pilih, bulan_awal, bulan_akhir,
+                analitik_n, terbawah=True
+            ),
+            use_container_width=True, hide_index=True
+        )
+
+    st.markdown(f"**📈 Year-over-Year vs {tahun_pilih - 1}**")
+    yoy_df = hotel_yoy(analitik_kolom, tahun_pilih, bulan_awal, bulan_akhir)
+    yoy_df["bulan"] = yoy_df["bulan"].map(BULAN_REVERSE)
+    st.dataframe(yoy_df, use_container_width=True, hide_index=True)
 
     # ======================
     # DOWNLOAD EXCEL
     # ======================
     st.markdown("## ⬇️ Download Kinerja Hotel (Excel)")
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        tpk_tbl.to_excel(writer, sheet_name="TPK", index=False)
-        gpr_tbl.to_excel(writer, sheet_name="GPR", index=False)
-        tptt_tbl.to_excel(writer, sheet_name="TPTT", index=False)
-        rlmta_tbl.to_excel(writer, sheet_name="RLMTA", index=False)
-        rlmtn_tbl.to_excel(writer, sheet_name="RLMTN", index=False)
+    # dibuat di worker pool ke data/exports; filter & versi data yang sama
+    # memakai ulang file yang sudah jadi (juga antar-sesi)
+    from utils import export_jobs
 
-    st.download_button(
-        "📥 Download Excel Kinerja Hotel",
-        data=output.getvalue(),
-        file_name="kinerja_hotel.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    export_id = export_jobs.hotel_export_id(export_filters)
+    export_status = export_jobs.job_status(export_id)
+
+    if export_status == "selesai":
+        # file baru dibaca saat tombol diklik, tidak disimpan per sesi di RAM
+        st.download_button(
+            "📥 Download Excel Kinerja Hotel",
+            data=export_jobs.job_path(export_id).read_bytes,
+            file_name="kinerja_hotel.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    elif export_status == "berjalan":
+        st.info("⏳ File Excel sedang dibuat...")
+        st.button("🔄 Cek Status")
+    else:
+        if export_status == "gagal":
+            st.error(f"❌ Export gagal: {export_jobs.job_error(export_id)}")
+        if st.button("⚙️ Buat Excel Kinerja Hotel"):
+            export_jobs.submit_hotel_export(export_filters)
+            st.rerun()
 
 
 # ======================
 # TAB ABSENSI (FINAL BENAR)
 # ======================
-with tab2:
+if halaman == "👥 Absensi":
     st.subheader("👥 Monitoring Absensi PML & PCL")
 
+    df_absen = load_table("absensi", tahun_pilih)
+    df_absen_f = take_rows(
+        df_absen,
+        select_rows(df_absen, bulan_awal, bulan_akhir),
+        ["bulan", "pml", "pcl", "target", "realisasi", "persentase"]
+    )
+
     role_filter = st.radio(
         "Tampilkan",
         ["Gabungan", "PML", "PCL"],
@@ -373,24 +464,33 @@ with tab2:
         use_container_width=True
     )
 
+    # ======================
+    # PERSENTIL PML (SQL)
+    # ======================
+    st.markdown("### 📐 Band Persentil Absensi per PML")
+    st.caption("Band 1 = kuartil terendah, band 4 = kuartil tertinggi")
+    st.dataframe(
+        absensi_percentile_bands(tahun_pilih, bulan_awal, bulan_akhir),
+        use_container_width=True, hide_index=True
+    )
+
     # ======================
     # DOWNLOAD (EXCEL SAJA - FIX)
     # ======================
     st.markdown("### ⬇️ Download Data (Excel)")
 
-    import io
-    output = io.BytesIO()
-
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df_view.to_excel(writer, index=False, sheet_name="Absensi")
-
+    # workbook baru dibuat (openpyxl di-import) saat tombol diklik
     st.download_button(
         label="📥 Download Excel",
-        data=output.getvalue(),
+        data=lambda: excel_bytes({"Absensi": df_view}),
         file_name="absensi.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
+# isi halaman selesai dirender (tidak tercatat jika halaman berhenti di st.stop)
+if "page_render_ms" not in st.session_state:
+    st.session_state.page_render_ms = record_startup("page_render", _t_start)
+
 # ======================
 # ADMIN PANEL
 # ======================
@@ -398,6 +498,20 @@ if st.session_state.role == "admin":
     st.sidebar.divider()
     st.sidebar.header("📤 Admin Panel")
 
+    with st.sidebar.expander("⏱ Waktu Startup"):
+        st.write(f"Import (cold start): {STARTUP_METRICS.get('import', 0):.0f} ms")
+        st.write(f"First paint proses: {STARTUP_METRICS.get('first_paint', 0):.0f} ms")
+        st.write(f"First paint sesi ini: {st.session_state.first_paint_ms:.0f} ms")
+        st.write(f"Render halaman proses: {STARTUP_METRICS.get('page_render', 0):.0f} ms")
+
+    with st.sidebar.expander("🧠 Memori Dataset Bersama"):
+        mem_df = memory_report()
+        if mem_df.empty:
+            st.write("Belum ada dataset dimuat.")
+        else:
+            st.dataframe(mem_df, hide_index=True)
+            st.write(f"Total: {mem_df['memori_mb'].sum():.2f} MB")
+
     UPLOAD_DIR = Path("data/uploads")
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -408,7 +522,45 @@ if st.session_state.role == "admin":
 
     uploaded_file = st.sidebar.file_uploader("Upload Excel", type=["xlsx"])
 
+    # ======================
+    # ARSIP TAHUN (READ-ONLY)
+    # ======================
+    st.sidebar.subheader("🗄 Arsip Tahun")
+    semua_tahun = list_years()
+    # tahun terbaru masih berjalan, tidak boleh diarsipkan
+    tahun_aktif = [
+        t for t in semua_tahun[:-1] if not is_archived(t)
+    ]
+    if tahun_aktif:
+        tahun_arsip = st.sidebar.selectbox("Tutup Tahun", tahun_aktif)
+        yakin = st.sidebar.checkbox(
+            f"Saya paham data {tahun_arsip} menjadi read-only",
+            key="konfirmasi_arsip"
+        )
+        if st.sidebar.button("📦 Arsipkan Tahun", disabled=not yakin):
+            try:
+                archive_year(tahun_arsip)
+            except ValueError as e:
+                st.sidebar.error(str(e))
+            else:
+                del st.session_state.konfirmasi_arsip
+                st.rerun()
+
+    tahun_diarsip = [t for t in semua_tahun if is_archived(t)]
+    if tahun_diarsip:
+        tahun_buka = st.sidebar.selectbox("Buka Arsip", tahun_diarsip)
+        if st.sidebar.button("📂 Buka Kembali Tahun"):
+            try:
+                unarchive_year(tahun_buka)
+            except ValueError as e:
+                st.sidebar.error(str(e))
+            else:
+                st.rerun()
+
     if uploaded_file:
+        from utils.ingest_excel import ingest_hotel_kinerja, ingest_absensi
+        from utils.ingest_excel import normalize_columns
+
         save_path = UPLOAD_DIR / uploaded_file.name
         with open(save_path, "wb") as f:
             f.write(uploaded_file.getbuffer())
@@ -417,10 +569,41 @@ if st.session_state.role == "admin":
         st.dataframe(df_preview, use_container_width=True)
 
         if st.button("🚀 INGEST KE DATABASE"):
-            if jenis_data == "Kinerja Hotel":
-                ingest_hotel_kinerja(save_path, tahun_input, bulan_input)
+            try:
+                if jenis_data == "Kinerja Hotel":
+                    jumlah, ditolak = ingest_hotel_kinerja(save_path, tahun_input, bulan_input)
+                else:
+                    jumlah, ditolak = ingest_absensi(save_path, tahun_input, bulan_input)
+            except (ValueError, sqlite3.Error) as e:
+                # semua tahun ditulis dalam satu transaksi, jadi gagal = tidak ada yang tersimpan
+                st.error(f"{e}\n\nIngest dibatalkan, tidak ada baris yang disimpan.")
             else:
-                ingest_absensi(save_path, tahun_input, bulan_input)
+                # laporan disimpan di session agar tetap tampil setelah rerun
+                st.session_state.ingest_report = (uploaded_file.name, jumlah, ditolak)
+                st.rerun()
+
+    # ======================
+    # LAPORAN INGEST
+    # ======================
+    if "ingest_report" in st.session_state:
+        nama_file, jumlah, ditolak = st.session_state.ingest_report
+
+        st.success(f"✅ {jumlah} baris dari {nama_file} berhasil di-ingest")
+
+        if not ditolak.empty:
+            st.warning(f"⚠️ {len(ditolak)} baris ditolak dan tidak disimpan")
+            # sel mentah bisa campuran angka & teks, tampilkan sebagai teks
+            st.dataframe(
+                ditolak.astype("string"),
+                use_container_width=True, hide_index=True
+            )
+            st.download_button(
+                "📥 Download Laporan Baris Ditolak",
+                data=excel_bytes({"Ditolak": ditolak}),
+                file_name=f"ditolak_{Path(nama_file).stem}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
-            st.success("✅ Data berhasil di-ingest")
+        if st.button("Tutup Laporan"):
+            del st.session_state.ingest_report
             st.rerun()
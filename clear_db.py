@@ -1,12 +1,8 @@
-import sqlite3
+import sys
 
-conn = sqlite3.connect("db/vhts.db")
-cur = conn.cursor()
+from utils.maintenance import main
 
-cur.execute("DELETE FROM hotel_kinerja;")
-cur.execute("DELETE FROM absensi;")
-
-conn.commit()
-conn.close()
-
-print("✅ Data hotel_kinerja & absensi berhasil dihapus")
+# Kompatibilitas lama: hapus SEMUA data hotel_kinerja & absensi.
+# Untuk purge terbatas (tabel/tahun/bulan) dan perawatan lain pakai:
+#   python -m utils.maintenance --help
+sys.exit(main(["purge", "--semua", "--termasuk-arsip"]))
@@ -0,0 +1,132 @@
+"""
+Cek alasan penolakan di utils/validation.py.
+
+Jalankan: python test_validation.py  (atau pytest test_validation.py)
+"""
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from utils import db
+from utils.validation import coerce_number, validate_hotel, validate_absensi
+
+HOTEL_COL = {k: k for k in ["hotel", "pml", "pcl", "tpk", "gpr", "tptt", "rlmta", "rlmtn"]}
+ABSENSI_COL = {k: k for k in ["pml", "pcl", "target", "realisasi"]}
+
+
+def _hotel(**ubah) -> pd.DataFrame:
+    baris = {
+        "tahun": 2025, "bulan": 3, "hotel": "Hotel A", "pml": "p", "pcl": "c",
+        "tpk": "55.5", "gpr": "1,250", "tptt": 40, "rlmta": 1, "rlmtn": 2,
+    }
+    baris.update(ubah)
+    return pd.DataFrame([baris])
+
+
+def _absensi(rows: list) -> pd.DataFrame:
+    return pd.DataFrame([
+        {"tahun": 2025, "bulan": 3, "pml": "p", "pcl": "c", **r} for r in rows
+    ])
+
+
+def _alasan(rejected: pd.DataFrame) -> str:
+    return "; ".join(rejected["alasan"])
+
+
+# ======================================================
+# KOERSI
+# ======================================================
+def test_coerce_number():
+    hasil = coerce_number(pd.Series(["1,234.5", " 7 ", "abc", None]))
+    assert hasil.iloc[0] == 1234.5
+    assert hasil.iloc[1] == 7
+    assert hasil.iloc[2:].isna().all()
+
+
+# ======================================================
+# HOTEL
+# ======================================================
+def test_hotel_valid():
+    valid, rejected = validate_hotel(_hotel(), HOTEL_COL)
+    assert rejected.empty
+    assert valid["tpk"].iloc[0] == 55.5
+    assert valid["gpr"].iloc[0] == 1250
+    assert valid["tahun"].iloc[0] == 2025
+
+
+def test_hotel_rejection_reasons():
+    kasus = {
+        "tahun bukan angka": _hotel(tahun="dua ribu"),
+        "tahun di luar": _hotel(tahun=1999),
+        "bulan di luar 1-12": _hotel(bulan=13),
+        "bulan bukan bilangan bulat": _hotel(bulan=2.5),
+        "hotel kosong": _hotel(hotel="  "),
+        "tpk di luar 0-100": _hotel(tpk=120),
+        "tptt bukan angka": _hotel(tptt="n/a"),
+        "gpr negatif": _hotel(gpr=-1),
+    }
+    for pesan, df in kasus.items():
+        valid, rejected = validate_hotel(df, HOTEL_COL)
+        assert valid.empty, pesan
+        assert pesan in _alasan(rejected), (pesan, _alasan(rejected))
+
+
+def test_baris_excel_numbering():
+    df = pd.concat([_hotel(), _hotel(bulan=0), _hotel(), _hotel(gpr=-5)], ignore_index=True)
+    valid, rejected = validate_hotel(df, HOTEL_COL)
+    assert len(valid) == 2
+    # baris 1 Excel = header, data dimulai di baris 2
+    assert rejected["baris_excel"].tolist() == [3, 5]
+
+
+def test_multiple_reasons_in_one_row():
+    _, rejected = validate_hotel(_hotel(bulan=13, tpk=-1), HOTEL_COL)
+    alasan = _alasan(rejected)
+    assert "bulan di luar 1-12" in alasan and "tpk di luar 0-100" in alasan
+
+
+# ======================================================
+# ABSENSI
+# ======================================================
+def test_absensi_percent_checks():
+    df = _absensi([
+        {"target": 10, "realisasi": 5},
+        {"target": 0, "realisasi": 0},
+        {"target": 10, "realisasi": 15},
+        {"target": -1, "realisasi": 0},
+    ])
+    valid, rejected = validate_absensi(df, ABSENSI_COL)
+    assert valid["persentase"].tolist() == [50.0, 0.0]
+    assert rejected["baris_excel"].tolist() == [4, 5]
+    assert "persentase > 100" in rejected["alasan"].iloc[0]
+    assert "target negatif" in rejected["alasan"].iloc[1]
+
+
+def test_archived_year_rejected():
+    lama = db.DB_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_dir(Path(tmp))
+        try:
+            db.ARCHIVE_DIR.mkdir(parents=True)
+            db.archive_partition_path(2024).touch()
+
+            df = _absensi([
+                {"tahun": 2024, "target": 10, "realisasi": 5},
+                {"tahun": 2025, "target": 10, "realisasi": 5},
+            ])
+            valid, rejected = validate_absensi(df, ABSENSI_COL)
+        finally:
+            db.set_db_dir(lama)
+
+    assert valid["tahun"].tolist() == [2025]
+    assert rejected["baris_excel"].tolist() == [2]
+    assert "tahun sudah diarsipkan" in rejected["alasan"].iloc[0]
+
+
+if __name__ == "__main__":
+    for nama, fungsi in list(globals().items()):
+        if nama.startswith("test_"):
+            fungsi()
+            print(f"✅ {nama}")
+    print("Validasi OK")
@@ -0,0 +1,162 @@
+import pandas as pd
+from functools import lru_cache
+
+from utils.db import connect_partitions, data_version
+
+# ======================================================
+# CONFIG
+# ======================================================
+INDIKATOR_HOTEL = ("tpk", "gpr", "tptt", "rlmta", "rlmtn")
+
+
+# ======================================================
+# BASIC UTILITIES
+# ======================================================
+def _check_indikator(kolom: str) -> str:
+    # nama kolom masuk ke SQL apa adanya, jadi wajib whitelist
+    if kolom not in INDIKATOR_HOTEL:
+        raise ValueError(f"❌ Indikator tidak dikenal: {kolom}")
+    return kolom
+
+
+def _query(sql: str, params: tuple, years) -> pd.DataFrame:
+    # hanya partisi tahun yang dibutuhkan yang di-ATTACH
+    conn = connect_partitions(years)
+    df = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+    return df
+
+
+# ======================================================
+# YEAR-OVER-YEAR PER HOTEL
+# ======================================================
+@lru_cache(maxsize=64)
+def _hotel_yoy(versi, kolom, tahun, bulan_awal, bulan_akhir):
+    return _query(f"""
+        WITH bulanan AS (
+            SELECT hotel, tahun, bulan, AVG({kolom}) AS nilai
+            FROM hotel_kinerja
+            WHERE tahun IN (?, ?)
+              AND bulan BETWEEN ? AND ?
+              AND hotel IS NOT NULL
+            GROUP BY hotel, tahun, bulan
+        ),
+        yoy AS (
+            SELECT
+                hotel, tahun, bulan, nilai,
+                LAG(nilai) OVER (
+                    PARTITION BY hotel, bulan ORDER BY tahun
+                ) AS nilai_tahun_lalu
+            FROM bulanan
+        )
+        SELECT
+            hotel, bulan, nilai, nilai_tahun_lalu,
+            nilai - nilai_tahun_lalu AS selisih,
+            CASE
+                WHEN nilai_tahun_lalu IS NULL OR nilai_tahun_lalu = 0 THEN NULL
+                ELSE (nilai - nilai_tahun_lalu) * 100.0 / nilai_tahun_lalu
+            END AS selisih_persen
+        FROM yoy
+        WHERE tahun = ?
+        ORDER BY hotel, bulan
+    """, (tahun - 1, tahun, bulan_awal, bulan_akhir, tahun), [tahun - 1, tahun])
+
+
+def hotel_yoy(kolom: str, tahun: int, bulan_awal: int = 1, bulan_akhir: int = 12) -> pd.DataFrame:
+    """
+    Perubahan indikator hotel dibanding bulan yang sama tahun lalu.
+    """
+    df = _hotel_yoy(
+        data_version(), _check_indikator(kolom),
+        int(tahun), int(bulan_awal), int(bulan_akhir)
+    )
+    return df.copy()
+
+
+# ======================================================
+# TOP / BOTTOM-N HOTEL
+# ======================================================
+@lru_cache(maxsize=64)
+def _hotel_ranking(versi, kolom, tahun, bulan_awal, bulan_akhir, n, terbawah):
+    urutan = "ASC" if terbawah else "DESC"
+    return _query(f"""
+        WITH rata AS (
+            SELECT hotel, AVG({kolom}) AS nilai, COUNT(*) AS jumlah_bulan
+            FROM hotel_kinerja
+            WHERE tahun = ?
+              AND bulan BETWEEN ? AND ?
+              AND hotel IS NOT NULL
+              AND {kolom} IS NOT NULL
+            GROUP BY hotel
+        ),
+        peringkat AS (
+            SELECT
+                RANK() OVER (ORDER BY nilai {urutan}) AS peringkat,
+                hotel, nilai, jumlah_bulan
+            FROM rata
+        )
+        SELECT * FROM peringkat
+        WHERE peringkat <= ?
+        ORDER BY peringkat, hotel
+    """, (tahun, bulan_awal, bulan_akhir, n), [tahun])
+
+
+def hotel_ranking(
+    kolom: str,
+    tahun: int,
+    bulan_awal: int = 1,
+    bulan_akhir: int = 12,
+    n: int = 10,
+    terbawah: bool = False
+) -> pd.DataFrame:
+    """
+    Peringkat N hotel teratas (atau terbawah) berdasarkan rata-rata indikator.
+    """
+    df = _hotel_ranking(
+        data_version(), _check_indikator(kolom),
+        int(tahun), int(bulan_awal), int(bulan_akhir), int(n), bool(terbawah)
+    )
+    return df.copy()
+
+
+# ======================================================
+# PERSENTIL ABSENSI PER PML
+# ======================================================
+@lru_cache(maxsize=64)
+def _absensi_percentile_bands(versi, tahun, bulan_awal, bulan_akhir, bands):
+    return _query("""
+        WITH per_pml AS (
+            SELECT
+                pml,
+                AVG(persentase) AS rata_persentase,
+                SUM(target) AS target,
+                SUM(realisasi) AS realisasi
+            FROM absensi
+            WHERE tahun = ?
+              AND bulan BETWEEN ? AND ?
+              AND pml IS NOT NULL
+            GROUP BY pml
+        )
+        SELECT
+            pml, target, realisasi, rata_persentase,
+            ROUND(PERCENT_RANK() OVER (ORDER BY rata_persentase) * 100, 1) AS persentil,
+            NTILE(?) OVER (ORDER BY rata_persentase) AS band
+        FROM per_pml
+        ORDER BY rata_persentase DESC, pml
+    """, (tahun, bulan_awal, bulan_akhir, bands), [tahun])
+
+
+def absensi_percentile_bands(
+    tahun: int,
+    bulan_awal: int = 1,
+    bulan_akhir: int = 12,
+    bands: int = 4
+) -> pd.DataFrame:
+    """
+    Rata-rata persentase absensi per PML beserta persentil dan band-nya
+    (band 1 = kelompok terendah).
+    """
+    df = _absensi_percentile_bands(
+        data_version(), int(tahun), int(bulan_awal), int(bulan_akhir), int(bands)
+    )
+    return df.copy()
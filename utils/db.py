@@ -1,3 +1,7 @@
+import os
+import re
+import stat
+import shutil
 import sqlite3
 import pandas as pd
 from pathlib import Path
@@ -5,21 +9,19 @@ from pathlib import Path
 DB_DIR = Path("db")
 DB_PATH = DB_DIR / "vhts.db"
 
+# =========================
+# PARTISI PER TAHUN
+# =========================
+# Data hotel_kinerja & absensi disimpan satu file SQLite per tahun.
+# Tahun aktif ada di db/partisi/, tahun yang sudah ditutup dipadatkan
+# ke db/arsip/ dan dibuka read-only.
+PARTITION_DIR = DB_DIR / "partisi"
+ARCHIVE_DIR = DB_DIR / "arsip"
+PARTITION_FILE = "vhts_{tahun}.db"
+PARTITION_PATTERN = re.compile(r"^vhts_(\d{4})\.db$")
 
-def init_db():
-    """
-    Inisialisasi database VHT-S
-    """
-    DB_DIR.mkdir(exist_ok=True)
-
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # =========================
-    # TABEL ABSENSI
-    # =========================
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS absensi (
+TABLE_COLUMNS = {
+    "absensi": """
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         tanggal DATE,
         tahun INTEGER,
@@ -29,14 +31,8 @@ def init_db():
         target INTEGER,
         realisasi INTEGER,
         persentase REAL
-    )
-    """)
-
-    # =========================
-    # TABEL KINERJA HOTEL
-    # =========================
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS hotel_kinerja (
+    """,
+    "hotel_kinerja": """
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         tanggal DATE,
         tahun INTEGER,
@@ -49,19 +45,396 @@ def init_db():
         tptt REAL,
         rlmta REAL,
         rlmtn REAL
-    )
-    """)
+    """,
+}
+PARTITIONED_TABLES = tuple(TABLE_COLUMNS)
 
-    conn.commit()
-    conn.close()
+TABLE_INDEXES = {
+    "absensi": [
+        "CREATE INDEX IF NOT EXISTS idx_absensi_bulan ON absensi (bulan, pml)",
+    ],
+    "hotel_kinerja": [
+        "CREATE INDEX IF NOT EXISTS idx_hotel_kinerja_bulan ON hotel_kinerja (bulan, hotel)",
+    ],
+}
+
+
+def init_db():
+    """
+    Inisialisasi database VHT-S
+    """
+    DB_DIR.mkdir(exist_ok=True)
+    PARTITION_DIR.mkdir(exist_ok=True)
+    ARCHIVE_DIR.mkdir(exist_ok=True)
+
+    # data lama di db/vhts.db dipindah ke partisi tahunan
+    migrate_legacy_tables()
 
 
 def get_connection():
     return sqlite3.connect(DB_PATH)
 
 
-def read_table(table_name: str) -> pd.DataFrame:
+def set_db_dir(path: Path):
+    """
+    Ganti lokasi folder database (dipakai CLI perawatan).
+    """
+    global DB_DIR, DB_PATH, PARTITION_DIR, ARCHIVE_DIR
+    DB_DIR = Path(path)
+    DB_PATH = DB_DIR / "vhts.db"
+    PARTITION_DIR = DB_DIR / "partisi"
+    ARCHIVE_DIR = DB_DIR / "arsip"
+
+
+# =========================
+# PATH & DAFTAR PARTISI
+# =========================
+def active_partition_path(tahun: int) -> Path:
+    return PARTITION_DIR / PARTITION_FILE.format(tahun=int(tahun))
+
+
+def archive_partition_path(tahun: int) -> Path:
+    return ARCHIVE_DIR / PARTITION_FILE.format(tahun=int(tahun))
+
+
+def is_archived(tahun: int) -> bool:
+    return archive_partition_path(tahun).exists()
+
+
+def partition_path(tahun: int):
+    """
+    File partisi untuk tahun tertentu (arsip diutamakan), None jika belum ada.
+    """
+    for path in (archive_partition_path(tahun), active_partition_path(tahun)):
+        if path.exists():
+            return path
+    return None
+
+
+def _partition_files() -> list:
+    files = []
+    for folder in (PARTITION_DIR, ARCHIVE_DIR):
+        if folder.exists():
+            files.extend(
+                p for p in folder.iterdir()
+                if PARTITION_PATTERN.match(p.name)
+            )
+    return files
+
+
+def list_years(table_name: str = None) -> list:
+    """
+    Daftar tahun yang punya partisi.
+    Jika table_name diisi, hanya tahun yang tabelnya berisi data.
+    """
+    years = sorted({
+        int(PARTITION_PATTERN.match(p.name).group(1))
+        for p in _partition_files()
+    })
+    if table_name is None:
+        return years
+
+    _check_table(table_name)
+    result = []
+    for tahun in years:
+        conn = _connect_file(partition_path(tahun), readonly=True)
+        ada = conn.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {table_name})"
+        ).fetchone()[0]
+        conn.close()
+        if ada:
+            result.append(tahun)
+    return result
+
+
+def _check_table(table_name: str):
+    if table_name not in TABLE_COLUMNS:
+        raise ValueError(f"❌ Tabel tidak dipartisi: {table_name}")
+
+
+def _connect_file(path: Path, readonly: bool = False):
+    if readonly:
+        return sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+    return sqlite3.connect(path)
+
+
+# =========================
+# BUAT & BUKA PARTISI
+# =========================
+def create_tables(conn):
+    cur = conn.cursor()
+    for table, columns in TABLE_COLUMNS.items():
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        for sql in TABLE_INDEXES[table]:
+            cur.execute(sql)
+
+
+def init_partition(tahun: int) -> Path:
+    """
+    Pastikan file partisi aktif untuk tahun tersebut ada.
+    """
+    if is_archived(tahun):
+        raise ValueError(f"❌ Tahun {tahun} sudah diarsipkan (read-only)")
+
+    PARTITION_DIR.mkdir(parents=True, exist_ok=True)
+    path = active_partition_path(tahun)
+
+    conn = sqlite3.connect(path)
+    # harus diset sebelum tabel pertama dibuat agar incremental vacuum aktif
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    create_tables(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def connect_partition(tahun: int):
+    """
+    Koneksi tulis ke partisi aktif satu tahun.
+    """
+    return sqlite3.connect(init_partition(tahun))
+
+
+def connect_partitions_write(years) -> tuple:
+    """
+    Satu koneksi tulis untuk beberapa partisi aktif sekaligus.
+
+    Partisi tahun pertama menjadi main, sisanya di-ATTACH sebagai p<tahun>,
+    sehingga satu commit berlaku atomik untuk semua tahun.
+    Hasil: (conn, {tahun: schema}).
+    """
+    years = sorted({int(t) for t in years})
+    # semua partisi disiapkan dulu: tahun yang diarsipkan gagal di sini,
+    # sebelum ada baris yang ditulis
+    paths = [init_partition(t) for t in years]
+
+    conn = sqlite3.connect(paths[0])
+    schemas = {years[0]: "main"}
+    try:
+        for tahun, path in zip(years[1:], paths[1:]):
+            schema = f"p{tahun}"
+            conn.execute("ATTACH DATABASE ? AS " + schema, (str(path),))
+            schemas[tahun] = schema
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn, schemas
+
+
+def connect_partitions(years) -> sqlite3.Connection:
+    """
+    Koneksi baca yang hanya meng-ATTACH partisi tahun yang diminta.
+
+    Tabel hotel_kinerja & absensi tersedia sebagai TEMP VIEW gabungan,
+    sehingga query lama tetap bisa dipakai apa adanya.
+    Batas SQLite: maksimal 10 partisi per koneksi.
+    """
+    conn = sqlite3.connect("file::memory:", uri=True)
+    cur = conn.cursor()
+
+    schemas = []
+    for tahun in sorted({int(t) for t in years}):
+        path = partition_path(tahun)
+        if path is None:
+            continue
+        schema = f"p{tahun}"
+        uri = f"file:{path.as_posix()}?mode=ro"
+        if is_archived(tahun):
+            uri += "&immutable=1"
+        cur.execute("ATTACH DATABASE ? AS " + schema, (uri,))
+        schemas.append(schema)
+
+    for table, columns in TABLE_COLUMNS.items():
+        if not schemas:
+            cur.execute(f"CREATE TEMP TABLE {table} ({columns})")
+            continue
+        union = " UNION ALL ".join(
+            f"SELECT * FROM {schema}.{table}" for schema in schemas
+        )
+        cur.execute(f"CREATE TEMP VIEW {table} AS {union}")
+
+    return conn
+
+
+def read_table(table_name: str, tahun: int = None) -> pd.DataFrame:
+    """
+    Baca seluruh tabel, atau satu tahun saja jika tahun diisi.
+
+    id AUTOINCREMENT berjalan per file partisi, jadi hasil gabungan
+    beberapa tahun bisa berisi id kembar: kunci uniknya (tahun, id).
+    """
+    if table_name not in TABLE_COLUMNS:
+        conn = get_connection()
+        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+        conn.close()
+        return df
+
+    years = list_years() if tahun is None else [tahun]
+
+    # dibaca per partisi agar tidak terbentur batas ATTACH
+    frames = []
+    for t in years or [None]:
+        conn = connect_partitions([] if t is None else [t])
+        frames.append(pd.read_sql_query(f"SELECT * FROM {table_name}", conn))
+        conn.close()
+
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def month_range(table_name: str, tahun: int) -> tuple:
+    """
+    (bulan_min, bulan_max) satu tahun tanpa memuat seluruh tabel.
+    """
+    _check_table(table_name)
+    conn = connect_partitions([tahun])
+    bulan_min, bulan_max = conn.execute(
+        f"SELECT MIN(bulan), MAX(bulan) FROM {table_name}"
+    ).fetchone()
+    conn.close()
+    return int(bulan_min), int(bulan_max)
+
+
+# =========================
+# OPERASI LEVEL FILE
+# =========================
+def archive_year(tahun: int) -> Path:
+    """
+    Tutup satu tahun: padatkan partisi aktif ke folder arsip (read-only).
+    """
+    src = active_partition_path(tahun)
+    dst = archive_partition_path(tahun)
+    if not src.exists():
+        raise ValueError(f"❌ Partisi aktif tahun {tahun} tidak ditemukan")
+    if dst.exists():
+        raise ValueError(f"❌ Tahun {tahun} sudah diarsipkan")
+    # tahun terbaru masih berjalan (masih di-ingest), tidak boleh ditutup
+    if int(tahun) >= max(list_years()):
+        raise ValueError(f"❌ Tahun {tahun} adalah tahun terbaru, belum bisa diarsipkan")
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_suffix(".tmp")
+    if tmp.exists():
+        tmp.unlink()
+
+    conn = sqlite3.connect(src)
+    conn.execute("ANALYZE")
+    conn.execute("VACUUM INTO ?", (str(tmp),))
+    conn.close()
+
+    os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp, dst)
+    src.unlink()
+    return dst
+
+
+def unarchive_year(tahun: int) -> Path:
+    """
+    Buka kembali tahun yang diarsipkan: salin arsip ke partisi aktif (bisa ditulis).
+    """
+    src = archive_partition_path(tahun)
+    dst = active_partition_path(tahun)
+    if not src.exists():
+        raise ValueError(f"❌ Arsip tahun {tahun} tidak ditemukan")
+    if dst.exists():
+        raise ValueError(f"❌ Partisi aktif tahun {tahun} sudah ada")
+
+    PARTITION_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_suffix(".tmp")
+    shutil.copyfile(src, tmp)
+    os.chmod(tmp, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp, dst)
+    src.unlink()
+    return dst
+
+
+def drop_year(tahun: int, include_archive: bool = False) -> list:
+    """
+    Hapus seluruh data satu tahun dengan menghapus file partisinya.
+    """
+    removed = []
+    targets = [active_partition_path(tahun)]
+    if include_archive:
+        targets.append(archive_partition_path(tahun))
+
+    for path in targets:
+        if path.exists():
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+# =========================
+# MIGRASI DATA LAMA
+# =========================
+def migrate_legacy_tables():
+    """
+    Pindahkan baris hotel_kinerja & absensi dari db/vhts.db ke partisi tahunan.
+    Aman dipanggil berulang; baris dengan tahun kosong dibiarkan.
+    """
+    if not DB_PATH.exists():
+        return
+
     conn = get_connection()
-    df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    cur = conn.cursor()
+
+    existing = {
+        r[0] for r in cur.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+
+    for table in PARTITIONED_TABLES:
+        if table not in existing:
+            continue
+
+        years = [
+            r[0] for r in cur.execute(
+                f"SELECT DISTINCT tahun FROM {table} WHERE tahun IS NOT NULL"
+            )
+        ]
+        for tahun in years:
+            path = init_partition(tahun)
+            columns = [
+                r[1] for r in cur.execute(f"PRAGMA table_info({table})")
+                if r[1] != "id"
+            ]
+            kolom = ", ".join(columns)
+
+            cur.execute("ATTACH DATABASE ? AS target", (str(path),))
+            cur.execute(f"""
+                INSERT INTO target.{table} ({kolom})
+                SELECT {kolom} FROM main.{table} WHERE tahun = ?
+            """, (tahun,))
+            cur.execute(f"DELETE FROM main.{table} WHERE tahun = ?", (tahun,))
+            conn.commit()
+            cur.execute("DETACH DATABASE target")
+
     conn.close()
-    return df
+
+
+def partition_version(tahun: int) -> tuple:
+    """
+    Versi data satu partisi tahun, (path, mtime_ns, size).
+    """
+    path = partition_path(tahun)
+    if path is None:
+        return (None, 0, 0)
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def data_version() -> tuple:
+    """
+    Versi data = (nama, mtime_ns, size) semua file database.
+    Berubah setiap kali ada commit tulis, dipakai sebagai kunci cache.
+    """
+    versi = []
+    for path in sorted([DB_PATH, *_partition_files()]):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        versi.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(versi)
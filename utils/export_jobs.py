@@ -0,0 +1,197 @@
+import os
+import time
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.db import connect_partitions, partition_version
+from utils.helpers import BULAN_REVERSE
+
+# ======================================================
+# CONFIG
+# ======================================================
+EXPORT_DIR = Path("data/exports")
+EXPORT_MAX_AGE = 24 * 3600  # detik; file lebih lama dibersihkan
+MAX_WORKERS = 2
+
+# nama sheet -> kolom indikator
+HOTEL_SHEETS = {
+    "TPK": "tpk",
+    "GPR": "gpr",
+    "TPTT": "tptt",
+    "RLMTA": "rlmta",
+    "RLMTN": "rlmtn",
+}
+
+# ======================================================
+# WORKER POOL (SATU PER PROSES)
+# ======================================================
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=MAX_WORKERS,
+    thread_name_prefix="vhts-export"
+)
+_LOCK = threading.Lock()
+_JOBS = {}  # job_id -> Future
+
+
+# ======================================================
+# BASIC UTILITIES
+# ======================================================
+def job_path(job_id: str) -> Path:
+    return EXPORT_DIR / f"{job_id}.xlsx"
+
+
+def _cleanup_exports():
+    if not EXPORT_DIR.exists():
+        return
+    batas = time.time() - EXPORT_MAX_AGE
+    # *.tmp: sisa proses yang mati di tengah penulisan
+    for pola in ("*.xlsx", "*.tmp"):
+        for path in EXPORT_DIR.glob(pola):
+            if path.stat().st_mtime < batas:
+                path.unlink(missing_ok=True)
+
+
+def _prune_jobs():
+    # future yang sukses tidak diperlukan lagi: file hasil jadi sumber status.
+    # future gagal disimpan sampai errornya dibaca lewat job_error()
+    for job_id, future in list(_JOBS.items()):
+        if future.done() and future.exception() is None:
+            _JOBS.pop(job_id, None)
+
+
+def _normalize_filters(filters: dict) -> dict:
+    # int & urutan hotel diseragamkan agar filter yang sama selalu sama ID-nya
+    result = {}
+    for kolom in HOTEL_SHEETS.values():
+        f = filters.get(kolom)
+        if f:
+            tahun, bulan_awal, bulan_akhir, hotels = f
+            f = (
+                int(tahun), int(bulan_awal), int(bulan_akhir),
+                tuple(sorted(str(h) for h in hotels or ()))
+            )
+        result[kolom] = f
+    return result
+
+
+def hotel_export_id(filters: dict) -> str:
+    """
+    ID job = hash filter + versi partisi yang dipakai.
+    Filter & versi data sama -> ID sama -> file hasil dipakai ulang.
+
+    filters: {kolom: (tahun, bulan_awal, bulan_akhir, (hotel, ...)) atau None}
+    """
+    key = []
+    for kolom, f in _normalize_filters(filters).items():
+        versi = partition_version(f[0]) if f else None
+        key.append((kolom, f, versi))
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return f"kinerja_hotel_{digest}"
+
+
+# ======================================================
+# STATUS JOB
+# ======================================================
+def job_status(job_id: str):
+    """
+    "selesai", "berjalan", "gagal", atau None jika belum pernah dibuat.
+    """
+    if job_path(job_id).exists():
+        future = _JOBS.get(job_id)
+        if future is not None and future.done():
+            _JOBS.pop(job_id, None)
+        return "selesai"
+
+    future = _JOBS.get(job_id)
+    if future is None:
+        return None
+    if not future.done():
+        return "berjalan"
+    if future.exception():
+        return "gagal"
+    # selesai tapi file sudah dibersihkan -> perlu dibuat ulang
+    return None
+
+
+def job_error(job_id: str):
+    """
+    Error job yang gagal; job dilepas setelah errornya dilaporkan.
+    """
+    future = _JOBS.get(job_id)
+    if future is None or not future.done():
+        return None
+    _JOBS.pop(job_id, None)
+    return future.exception()
+
+
+# ======================================================
+# SUBMIT
+# ======================================================
+def submit_hotel_export(filters: dict) -> str:
+    """
+    Jadwalkan export Excel Kinerja Hotel di worker pool.
+    """
+    job_id = hotel_export_id(filters)
+
+    with _LOCK:
+        if job_status(job_id) in ("selesai", "berjalan"):
+            return job_id
+
+        _prune_jobs()
+        _cleanup_exports()
+        _JOBS[job_id] = _EXECUTOR.submit(
+            _build_hotel_export, job_path(job_id), _normalize_filters(filters)
+        )
+    return job_id
+
+
+# ======================================================
+# BUILD (DI WORKER)
+# ======================================================
+def _hotel_rows(kolom: str, tahun: int, bulan_awal: int, bulan_akhir: int, hotels: tuple):
+    sql = f"""
+        SELECT hotel, bulan, {kolom}
+        FROM hotel_kinerja
+        WHERE bulan BETWEEN ? AND ?
+    """
+    params = [bulan_awal, bulan_akhir]
+    if hotels:
+        sql += f" AND hotel IN ({', '.join('?' * len(hotels))})"
+        params.extend(hotels)
+    sql += " ORDER BY hotel, bulan"
+
+    conn = connect_partitions([tahun])
+    try:
+        # cursor dibaca bertahap, tidak pernah jadi DataFrame penuh
+        for hotel, bulan, nilai in conn.execute(sql, params):
+            yield hotel, BULAN_REVERSE.get(bulan, bulan), nilai
+    finally:
+        conn.close()
+
+
+def _build_hotel_export(path: Path, filters: dict) -> Path:
+    from openpyxl import Workbook
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # write-only: setiap sheet ditulis bertahap ke file temp oleh openpyxl
+    wb = Workbook(write_only=True)
+    for sheet_name, kolom in HOTEL_SHEETS.items():
+        ws = wb.create_sheet(sheet_name)
+        f = filters.get(kolom)
+        if not f:
+            continue
+        ws.append(["hotel", "bulan", kolom])
+        for row in _hotel_rows(kolom, *f):
+            ws.append(row)
+
+    tmp = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp")
+    try:
+        wb.save(tmp)
+        os.replace(tmp, path)
+    finally:
+        # save gagal -> file temp setengah jadi tidak ditinggal
+        tmp.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,39 @@
+import time
+import logging
+
+logger = logging.getLogger("vhts.startup")
+
+# Streamlit tidak memasang handler untuk logger aplikasi; tanpa ini
+# waktu startup tidak pernah sampai ke log server
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s"
+    ))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+BULAN_MAP = {
+    "Januari": 1, "Februari": 2, "Maret": 3, "April": 4,
+    "Mei": 5, "Juni": 6, "Juli": 7, "Agustus": 8,
+    "September": 9, "Oktober": 10, "November": 11, "Desember": 12
+}
+BULAN_REVERSE = {v: k for k, v in BULAN_MAP.items()}
+
+# metrik cold start proses ini, diisi sekali oleh run pertama
+STARTUP_METRICS = {}
+
+
+def elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def record_startup(label: str, start: float) -> float:
+    """
+    Catat durasi sejak `start` (perf_counter) ke log & STARTUP_METRICS.
+    """
+    ms = elapsed_ms(start)
+    STARTUP_METRICS.setdefault(label, ms)
+    logger.info("%s: %.1f ms", label, ms)
+    return ms
@@ -1,21 +1,14 @@
-import sqlite3
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
-# ======================================================
-# CONFIG
-# ======================================================
-DB_PATH = Path("db/vhts.db")
+from utils.db import connect_partitions_write
+from utils.validation import validate_hotel, validate_absensi
 
 
 # ======================================================
 # BASIC UTILITIES
 # ======================================================
-def connect_db():
-    return sqlite3.connect(DB_PATH)
-
-
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = (
         df.columns.astype(str)
@@ -43,6 +36,32 @@ def resolve_columns(df: pd.DataFrame, column_map: dict) -> dict:
     return resolved
 
 
+def _records(df: pd.DataFrame, columns: list) -> list:
+    # tuple siap executemany: NaN -> NULL, tanggal ingest di depan
+    tanggal = datetime.now().date()
+    values = df[columns].astype(object)
+    values = values.where(values.notna(), None)
+    return [(tanggal, *row) for row in values.itertuples(index=False, name=None)]
+
+
+def _write_years(valid: pd.DataFrame, insert):
+    """
+    Tulis baris valid ke partisi tahunnya dalam SATU transaksi.
+    Gagal di salah satu tahun -> tidak ada tahun yang tersimpan.
+    """
+    if valid.empty:
+        return
+
+    conn, schemas = connect_partitions_write(valid["tahun"].unique())
+    try:
+        with conn:
+            cur = conn.cursor()
+            for tahun_data, df_tahun in valid.groupby("tahun"):
+                insert(cur, schemas[int(tahun_data)], df_tahun)
+    finally:
+        conn.close()
+
+
 def check_duplicate(conn, table: str, tahun: int, bulan: int):
     cur = conn.cursor()
     cur.execute(
@@ -52,15 +71,6 @@ def check_duplicate(conn, table: str, tahun: int, bulan: int):
     return cur.fetchone()[0] > 0
 
 
-# ======================================================
-# 🔥 HELPER PALING PENTING (FINAL)
-# ======================================================
-def clean_number(val):
-    if pd.isna(val):
-        return None
-    return float(str(val).replace(",", "").strip())
-
-
 # ======================================================
 # COLUMN MAP
 # ======================================================
@@ -102,46 +112,35 @@ def ingest_hotel_kinerja(
     # ======================================================
     # ATUR TAHUN & BULAN (PRIORITAS EXCEL)
     # ======================================================
+    # nilai di Excel dikoersi & dicek di tahap validasi
     if "tahun" not in df.columns:
         df["tahun"] = tahun
-    else:
-        df["tahun"] = df["tahun"].astype(str).str.replace(",", "").astype(int)
 
     if "bulan" not in df.columns:
         df["bulan"] = bulan
-    else:
-        df["bulan"] = df["bulan"].astype(str).str.replace(",", "").astype(int)
-
 
     col = resolve_columns(df, HOTEL_COLUMN_MAP)
 
-    conn = connect_db()
-    cur = conn.cursor()
+    # validasi seluruh file dulu, baru tulis ke DB
+    valid, rejected = validate_hotel(df, col)
+    _write_years(valid, _insert_hotel_kinerja)
 
-    for _, row in df.iterrows():
-        cur.execute("""
-            INSERT INTO hotel_kinerja (
-                tanggal, tahun, bulan,
-                hotel, pml, pcl,
-                tpk, gpr, tptt, rlmta, rlmtn
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().date(),
-            row["tahun"],
-            row["bulan"],
-            row[col["hotel"]],
-            row[col["pml"]],
-            row[col["pcl"]],
-            clean_number(row[col["tpk"]]),
-            clean_number(row[col["gpr"]]),
-            clean_number(row[col["tptt"]]),
-            clean_number(row[col["rlmta"]]),
-            clean_number(row[col["rlmtn"]]),
-        ))
-
-    conn.commit()
-    conn.close()
+    return len(valid), rejected
+
+
+def _insert_hotel_kinerja(cur, schema: str, df: pd.DataFrame):
+    cur.executemany(f"""
+        INSERT INTO {schema}.hotel_kinerja (
+            tanggal, tahun, bulan,
+            hotel, pml, pcl,
+            tpk, gpr, tptt, rlmta, rlmtn
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, _records(df, [
+        "tahun", "bulan",
+        "hotel", "pml", "pcl",
+        "tpk", "gpr", "tptt", "rlmta", "rlmtn",
+    ]))
 
 
 # ======================================================
@@ -162,45 +161,32 @@ def ingest_absensi(
     # ======================================================
     # ATUR TAHUN & BULAN (PRIORITAS EXCEL)
     # ======================================================
+    # nilai di Excel dikoersi & dicek di tahap validasi
     if "tahun" not in df.columns:
         df["tahun"] = tahun
-    else:
-        df["tahun"] = df["tahun"].astype(str).str.replace(",", "").astype(int)
 
     if "bulan" not in df.columns:
         df["bulan"] = bulan
-    else:
-        df["bulan"] = df["bulan"].astype(str).str.replace(",", "").astype(int)
-
 
     col = resolve_columns(df, ABSENSI_COLUMN_MAP)
 
-    conn = connect_db()
-    cur = conn.cursor()
+    # validasi seluruh file dulu, baru tulis ke DB
+    valid, rejected = validate_absensi(df, col)
+    _write_years(valid, _insert_absensi)
+
+    return len(valid), rejected
 
-    for _, row in df.iterrows():
-        target = clean_number(row[col["target"]])
-        realisasi = clean_number(row[col["realisasi"]])
-
-        persentase = (realisasi / target * 100) if target not in (None, 0) else 0
-
-        cur.execute("""
-            INSERT INTO absensi (
-                tanggal, tahun, bulan,
-                pml, pcl,
-                target, realisasi, persentase
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().date(),
-            row["tahun"],
-            row["bulan"],
-            row[col["pml"]],
-            row[col["pcl"]],
-            target,
-            realisasi,
-            persentase
-        ))
-
-    conn.commit()
-    conn.close()
+
+def _insert_absensi(cur, schema: str, df: pd.DataFrame):
+    cur.executemany(f"""
+        INSERT INTO {schema}.absensi (
+            tanggal, tahun, bulan,
+            pml, pcl,
+            target, realisasi, persentase
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, _records(df, [
+        "tahun", "bulan",
+        "pml", "pcl",
+        "target", "realisasi", "persentase",
+    ]))
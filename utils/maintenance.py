@@ -0,0 +1,298 @@
+"""
+Perintah perawatan database VHT-S.
+
+Contoh:
+    python -m utils.maintenance purge --tabel absensi --tahun 2025 --bulan 3
+    python -m utils.maintenance vacuum --incremental
+    python -m utils.maintenance analyze
+    python -m utils.maintenance integrity
+    python -m utils.maintenance rebuild
+    python -m utils.maintenance archive --tahun 2024
+"""
+import sys
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+from utils import db
+
+
+# ======================================================
+# BASIC UTILITIES
+# ======================================================
+def _all_files(include_archive: bool = True) -> list:
+    files = [db.DB_PATH] if db.DB_PATH.exists() else []
+    for tahun in db.list_years():
+        path = db.partition_path(tahun)
+        if include_archive or not db.is_archived(tahun):
+            files.append(path)
+    return files
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+def _print_report(before: dict, elapsed: float):
+    print("\n📏 Ukuran file:")
+    total_before = total_after = 0
+    for path in sorted(set(before) | set(_all_files())):
+        size_before = before.get(path, 0)
+        size_after = _file_size(path)
+        total_before += size_before
+        total_after += size_after
+        print(
+            f"   {path}: {_format_size(size_before)} → {_format_size(size_after)}"
+        )
+    print(
+        f"   TOTAL: {_format_size(total_before)} → {_format_size(total_after)}"
+    )
+    print(f"⏱ Selesai dalam {elapsed:.2f} detik")
+
+
+# ======================================================
+# PURGE
+# ======================================================
+def purge(
+    tabel: str = None,
+    tahun: int = None,
+    bulan: int = None,
+    include_archive: bool = False
+):
+    """
+    Hapus data sesuai cakupan tabel/tahun/bulan.
+    Satu tahun penuh dihapus di level file (partisi dibuang).
+    """
+    tables = [tabel] if tabel else list(db.PARTITIONED_TABLES)
+    years = [tahun] if tahun else db.list_years()
+
+    for t in years:
+        archived = db.is_archived(t)
+        if archived and not include_archive:
+            print(f"⏭ {t}: arsip dilewati (pakai --termasuk-arsip)")
+            continue
+
+        if tabel is None and bulan is None:
+            for path in db.drop_year(t, include_archive=include_archive):
+                print(f"🗑 {t}: file {path} dihapus")
+            continue
+
+        if archived:
+            print(f"⏭ {t}: arsip read-only, hanya bisa dihapus satu tahun penuh")
+            continue
+
+        path = db.active_partition_path(t)
+        if not path.exists():
+            continue
+
+        conn = sqlite3.connect(path)
+        cur = conn.cursor()
+        for table in tables:
+            if bulan is None:
+                cur.execute(f"DELETE FROM {table}")
+            else:
+                cur.execute(f"DELETE FROM {table} WHERE bulan = ?", (bulan,))
+            scope = f"bulan {bulan}" if bulan else "semua bulan"
+            print(f"🗑 {t}: {cur.rowcount} baris {table} ({scope}) dihapus")
+        conn.commit()
+        conn.close()
+
+
+# ======================================================
+# VACUUM / ANALYZE
+# ======================================================
+def vacuum(incremental: bool = False):
+    # arsip sudah dipadatkan saat dibuat dan bersifat read-only
+    for path in _all_files(include_archive=False):
+        conn = sqlite3.connect(path)
+        if incremental:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                print(f"⚠️ {path}: auto_vacuum bukan INCREMENTAL, pakai VACUUM penuh")
+                conn.execute("VACUUM")
+            else:
+                conn.execute("PRAGMA incremental_vacuum").fetchall()
+        else:
+            conn.execute("VACUUM")
+        conn.close()
+        print(f"🧹 {path}: vacuum selesai")
+
+
+def analyze():
+    for path in _all_files(include_archive=False):
+        conn = sqlite3.connect(path)
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+        conn.close()
+        print(f"📊 {path}: statistik planner diperbarui")
+
+
+# ======================================================
+# INTEGRITY
+# ======================================================
+def integrity(quick: bool = False) -> bool:
+    pragma = "quick_check" if quick else "integrity_check"
+    files = _all_files()
+    if not files:
+        print(f"❌ Tidak ada file database di {db.DB_DIR}")
+        return False
+
+    ok = True
+    for path in files:
+        conn = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+        hasil = [r[0] for r in conn.execute(f"PRAGMA {pragma}")]
+        conn.close()
+
+        if hasil == ["ok"]:
+            print(f"✅ {path}: ok")
+        else:
+            ok = False
+            print(f"❌ {path}:")
+            for pesan in hasil:
+                print(f"   {pesan}")
+    return ok
+
+
+# ======================================================
+# REBUILD
+# ======================================================
+def rebuild():
+    """
+    Bangun ulang turunan data: migrasi tabel lama, tabel & indeks partisi.
+    """
+    db.migrate_legacy_tables()
+
+    for path in _all_files(include_archive=False):
+        if path == db.DB_PATH:
+            continue
+        conn = sqlite3.connect(path)
+        indexes = [
+            r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            )
+        ]
+        for name in indexes:
+            conn.execute(f"DROP INDEX {name}")
+        db.create_tables(conn)
+        conn.execute("REINDEX")
+        conn.commit()
+        conn.close()
+        print(f"🔧 {path}: tabel & indeks dibangun ulang")
+
+
+# ======================================================
+# CLI
+# ======================================================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.maintenance",
+        description="Perawatan database VHT-S"
+    )
+    parser.add_argument(
+        "--db-dir", type=Path, default=None,
+        help="Folder database (default: db)"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("purge", help="Hapus data per tabel/tahun/bulan")
+    p.add_argument("--tabel", choices=db.PARTITIONED_TABLES)
+    p.add_argument("--tahun", type=int)
+    p.add_argument("--bulan", type=int, choices=range(1, 13), metavar="1-12")
+    p.add_argument(
+        "--termasuk-arsip", action="store_true",
+        help="Ikut hapus file arsip (hanya untuk satu tahun penuh)"
+    )
+    p.add_argument(
+        "--semua", action="store_true",
+        help="Wajib jika tanpa --tabel/--tahun/--bulan (hapus SEMUA data)"
+    )
+
+    p = sub.add_parser("vacuum", help="Kembalikan ruang kosong ke disk")
+    p.add_argument(
+        "--incremental", action="store_true",
+        help="Pakai PRAGMA incremental_vacuum"
+    )
+
+    sub.add_parser("analyze", help="ANALYZE + PRAGMA optimize")
+
+    p = sub.add_parser("integrity", help="Cek integritas semua file")
+    p.add_argument("--quick", action="store_true", help="Pakai quick_check")
+
+    sub.add_parser("rebuild", help="Bangun ulang tabel, indeks & migrasi data lama")
+
+    p = sub.add_parser("archive", help="Arsipkan satu tahun (read-only)")
+    p.add_argument("--tahun", type=int, required=True)
+
+    p = sub.add_parser("unarchive", help="Buka kembali tahun yang diarsipkan")
+    p.add_argument("--tahun", type=int, required=True)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.db_dir is not None:
+        db.set_db_dir(args.db_dir)
+    if not db.DB_DIR.is_dir():
+        parser.error(f"folder database tidak ditemukan: {db.DB_DIR}")
+
+    # purge tanpa cakupan menghapus semua partisi & tidak bisa dibatalkan
+    if (
+        args.command == "purge" and not args.semua
+        and args.tabel is None and args.tahun is None and args.bulan is None
+    ):
+        parser.error(
+            "purge tanpa --tabel/--tahun/--bulan menghapus SEMUA data; "
+            "tambahkan --semua untuk melanjutkan"
+        )
+
+    # hanya perintah yang menulis data yang ikut memigrasi data lama
+    if args.command in ("purge", "rebuild"):
+        db.init_db()
+
+    before = {path: _file_size(path) for path in _all_files()}
+    start = time.perf_counter()
+    status = 0
+
+    if args.command == "purge":
+        purge(args.tabel, args.tahun, args.bulan, args.termasuk_arsip)
+    elif args.command == "vacuum":
+        vacuum(args.incremental)
+    elif args.command == "analyze":
+        analyze()
+    elif args.command == "integrity":
+        status = 0 if integrity(args.quick) else 1
+    elif args.command == "rebuild":
+        rebuild()
+    elif args.command in ("archive", "unarchive"):
+        try:
+            if args.command == "archive":
+                print(f"📦 {args.tahun}: diarsipkan ke {db.archive_year(args.tahun)}")
+            else:
+                print(f"📂 {args.tahun}: dibuka kembali ke {db.unarchive_year(args.tahun)}")
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            status = 1
+
+    _print_report(before, time.perf_counter() - start)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from utils.db import read_table, partition_version
+
+# ======================================================
+# DATASET BERSAMA (SATU PER PROSES)
+# ======================================================
+# Semua sesi Streamlit berbagi satu DataFrame per (tabel, tahun) untuk
+# versi data terbaru. Setiap pemanggil mendapat shallow copy: dengan
+# copy-on-write (pandas >= 3) datanya dibagi, tapi penulisan oleh satu
+# sesi membuat salinan sendiri dan tidak bocor ke frame bersama.
+_LOCK = threading.Lock()
+_DATASETS = {}  # (tabel, tahun) -> (versi, DataFrame)
+
+
+def _load(table_name: str, tahun: int) -> pd.DataFrame:
+    df = read_table(table_name, tahun=tahun)
+    df["tahun"] = pd.to_numeric(df["tahun"], errors="coerce")
+    df["bulan"] = pd.to_numeric(df["bulan"], errors="coerce")
+    return df
+
+
+def get_dataset(table_name: str, tahun: int) -> pd.DataFrame:
+    """
+    View copy-on-write atas DataFrame bersama untuk satu tabel & tahun.
+    Dimuat ulang otomatis jika file partisinya berubah.
+    """
+    key = (table_name, int(tahun))
+    versi = partition_version(tahun)
+
+    cached = _DATASETS.get(key)
+    if cached is not None and cached[0] == versi:
+        return cached[1].copy(deep=False)
+
+    # satu sesi saja yang memuat, sesi lain menunggu lalu memakai hasilnya
+    with _LOCK:
+        cached = _DATASETS.get(key)
+        if cached is None or cached[0] != versi:
+            cached = (versi, _load(table_name, tahun))
+            _DATASETS[key] = cached
+    return cached[1].copy(deep=False)
+
+
+# ======================================================
+# FILTER
+# ======================================================
+def select_rows(
+    df: pd.DataFrame,
+    bulan_awal: int = None,
+    bulan_akhir: int = None,
+    **isin
+) -> np.ndarray:
+    """
+    Posisi baris yang lolos filter bulan & kolom=daftar_nilai
+    (daftar kosong/None = tidak difilter).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if bulan_awal is not None or bulan_akhir is not None:
+        mask &= df["bulan"].between(
+            bulan_awal or 1, bulan_akhir or 12
+        ).to_numpy()
+    for kolom, nilai in isin.items():
+        if nilai:
+            mask &= df[kolom].isin(nilai).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def take_rows(df: pd.DataFrame, idx: np.ndarray, columns: list = None) -> pd.DataFrame:
+    """
+    Ambil baris (dan kolom) yang dibutuhkan untuk ditampilkan.
+    take() selalu MENYALIN baris terpilih; pilih kolom seperlunya agar
+    salinannya kecil.
+    """
+    if columns is not None:
+        df = df[columns]
+    return df.take(idx)
+
+
+# ======================================================
+# LAPORAN MEMORI
+# ======================================================
+def memory_report() -> pd.DataFrame:
+    # snapshot di bawah lock: sesi lain bisa menambah dataset saat iterasi
+    with _LOCK:
+        items = sorted(_DATASETS.items())
+
+    rows = []
+    for (table_name, tahun), (versi, df) in items:
+        rows.append({
+            "tabel": table_name,
+            "tahun": tahun,
+            "diperbarui": pd.Timestamp(versi[1], unit="ns"),
+            "baris": len(df),
+            "memori_mb": df.memory_usage(deep=True).sum() / 1024 ** 2,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,157 @@
+import pandas as pd
+
+from utils.db import is_archived
+
+# ======================================================
+# CONFIG
+# ======================================================
+TAHUN_MIN, TAHUN_MAX = 2000, 2100
+PERSEN_MAX = 100
+
+HOTEL_PERCENT_COLUMNS = ["tpk", "tptt"]
+HOTEL_NONNEGATIVE_COLUMNS = ["gpr", "rlmta", "rlmtn"]
+
+
+# ======================================================
+# KOERSI (VEKTOR)
+# ======================================================
+def coerce_number(s: pd.Series) -> pd.Series:
+    """
+    Hapus pemisah ribuan "," lalu ke float, sekaligus satu kolom.
+    Nilai yang tidak bisa dibaca menjadi NaN.
+    """
+    if pd.api.types.is_numeric_dtype(s):
+        return s.astype(float)
+    cleaned = s.astype("string").str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").astype(float)
+
+
+class _Checker:
+    """
+    Kumpulkan alasan penolakan per baris tanpa loop per baris.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.alasan = pd.Series("", index=df.index, dtype="string")
+
+    def reject(self, mask: pd.Series, pesan: str):
+        mask = mask.fillna(False).astype(bool)
+        self.alasan = self.alasan.mask(mask, self.alasan + pesan + "; ")
+
+    def number(self, raw: pd.Series, nama: str, wajib: bool = False) -> pd.Series:
+        num = coerce_number(raw)
+        self.reject(raw.notna() & num.isna(), f"{nama} bukan angka")
+        if wajib:
+            self.reject(raw.isna(), f"{nama} kosong")
+        return num
+
+    def text(self, raw: pd.Series, nama: str) -> pd.Series:
+        txt = raw.astype("string").str.strip()
+        self.reject(txt.isna() | (txt == ""), f"{nama} kosong")
+        return txt
+
+    @property
+    def invalid(self) -> pd.Series:
+        return self.alasan != ""
+
+
+def _periode(checker: _Checker, df: pd.DataFrame) -> tuple:
+    tahun = checker.number(df["tahun"], "tahun", wajib=True)
+    bulan = checker.number(df["bulan"], "bulan", wajib=True)
+
+    checker.reject(tahun.notna() & (tahun % 1 != 0), "tahun bukan bilangan bulat")
+    checker.reject(
+        ~tahun.between(TAHUN_MIN, TAHUN_MAX) & tahun.notna(),
+        f"tahun di luar {TAHUN_MIN}-{TAHUN_MAX}"
+    )
+    checker.reject(bulan.notna() & (bulan % 1 != 0), "bulan bukan bilangan bulat")
+    checker.reject(~bulan.between(1, 12) & bulan.notna(), "bulan di luar 1-12")
+
+    # cukup dicek per tahun unik, bukan per baris
+    tahun_unik = tahun[tahun.notna() & (tahun % 1 == 0)].drop_duplicates()
+    archived = [t for t in tahun_unik if is_archived(int(t))]
+    checker.reject(tahun.isin(archived), "tahun sudah diarsipkan (read-only)")
+    return tahun, bulan
+
+
+def _split(df: pd.DataFrame, clean: pd.DataFrame, checker: _Checker) -> tuple:
+    invalid = checker.invalid
+
+    valid = clean[~invalid].copy()
+    valid["tahun"] = valid["tahun"].astype(int)
+    valid["bulan"] = valid["bulan"].astype(int)
+
+    rejected = df[invalid].copy()
+    # nomor baris sesuai tampilan Excel (baris 1 = header)
+    rejected.insert(0, "baris_excel", rejected.index + 2)
+    rejected["alasan"] = checker.alasan[invalid].str.rstrip("; ")
+    return valid, rejected.reset_index(drop=True)
+
+
+# ======================================================
+# VALIDASI HOTEL
+# ======================================================
+def validate_hotel(df: pd.DataFrame, col: dict) -> tuple:
+    """
+    Koersi & cek seluruh kolom kinerja hotel sekaligus.
+    Hasil: (baris valid dengan nama kolom standar, laporan baris ditolak).
+    """
+    checker = _Checker(df)
+    tahun, bulan = _periode(checker, df)
+
+    clean = pd.DataFrame({
+        "tahun": tahun,
+        "bulan": bulan,
+        "hotel": checker.text(df[col["hotel"]], "hotel"),
+        "pml": df[col["pml"]],
+        "pcl": df[col["pcl"]],
+    })
+
+    for kolom in HOTEL_PERCENT_COLUMNS:
+        num = checker.number(df[col[kolom]], kolom)
+        checker.reject(
+            ~num.between(0, PERSEN_MAX) & num.notna(),
+            f"{kolom} di luar 0-{PERSEN_MAX}"
+        )
+        clean[kolom] = num
+
+    for kolom in HOTEL_NONNEGATIVE_COLUMNS:
+        num = checker.number(df[col[kolom]], kolom)
+        checker.reject(num < 0, f"{kolom} negatif")
+        clean[kolom] = num
+
+    return _split(df, clean, checker)
+
+
+# ======================================================
+# VALIDASI ABSENSI
+# ======================================================
+def validate_absensi(df: pd.DataFrame, col: dict) -> tuple:
+    """
+    Koersi & cek seluruh kolom absensi sekaligus, termasuk persentase.
+    Hasil: (baris valid dengan nama kolom standar, laporan baris ditolak).
+    """
+    checker = _Checker(df)
+    tahun, bulan = _periode(checker, df)
+
+    target = checker.number(df[col["target"]], "target")
+    realisasi = checker.number(df[col["realisasi"]], "realisasi")
+    checker.reject(target < 0, "target negatif")
+    checker.reject(realisasi < 0, "realisasi negatif")
+
+    persentase = (realisasi / target * 100).where(target.notna() & (target != 0), 0)
+    checker.reject(
+        persentase > PERSEN_MAX,
+        f"persentase > {PERSEN_MAX} (realisasi melebihi target)"
+    )
+
+    clean = pd.DataFrame({
+        "tahun": tahun,
+        "bulan": bulan,
+        "pml": df[col["pml"]],
+        "pcl": df[col["pcl"]],
+        "target": target,
+        "realisasi": realisasi,
+        "persentase": persentase,
+    })
+    return _split(df, clean, checker)